@@ -1,20 +1,36 @@
 # app.py
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, abort, Response, g, get_flashed_messages
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 import sys
 import os
+import orjson
+import queue
+import sqlite3
+import hashlib
+import hmac
+import threading
 from datetime import datetime
+from functools import lru_cache
+from cachetools import TTLCache
+from jinja2 import FileSystemBytecodeCache
 
 # Add the parent directory of 'utils' to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')))
 
 # Import the custom data structures
-from structures import Folder, File, HashTable, binary_search_files, RecycleBin, traverse_and_collect_all_items
+from structures import Folder, File, RecycleBin, traverse_and_collect_all_items, files_by_name, files_by_author
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your_very_secret_key_here' # IMPORTANT: Change this to a strong, random key in production!
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 43200 # Let browsers cache static assets for 12 hours
+app.config['USERS_DB'] = os.environ.get('USERS_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'users.db'))
+
+# Persist compiled templates so new worker processes skip Jinja compilation
+_jinja_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.jinja_cache')
+os.makedirs(_jinja_cache_dir, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(_jinja_cache_dir)
 
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -26,16 +42,131 @@ root_folder = Folder("root")
 # Initialize the global recycle bin
 recycle_bin = RecycleBin()
 
-# In-memory user storage for demonstration purposes.
-# In a real application, this would be a database.
-# Format: {'username': {'password_hash': 'hashed_password', 'id': 'user_id'}}\
-users = {
-    'testuser': {
-        'password_hash': generate_password_hash('password123'),
-        'id': '1'
-    }
-}
-next_user_id = 2 # Simple ID counter for new registrations
+# Pre-encoded JSON for /get_file_system. Rebuilt lazily after any change to the tree.
+_fs_cache = None
+# Bumped on every invalidation, so a response streamed while the tree changed is not cached.
+_fs_generation = 0
+
+# One queue per client connected to /fs_stream; each receives every file-system delta.
+_fs_subscribers = []
+# Deltas a client may fall behind by before it is disconnected (it reconnects and refetches)
+FS_STREAM_QUEUE_SIZE = 256
+
+# --- User Storage ---
+# Users are persisted in SQLite (WAL mode, so readers never block the writer).
+# Lookups are memoized per worker process with lru_cache in front of the database.
+
+def get_db():
+    """
+    Returns the SQLite connection for the current app context, opening it on first use.
+    sqlite3 keeps a per-connection cache of prepared statements, so the parameterized
+    queries below are compiled once per connection.
+    """
+    if 'db' not in g:
+        g.db = sqlite3.connect(app.config['USERS_DB'])
+        g.db.row_factory = sqlite3.Row
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exception):
+    """Closes the SQLite connection at the end of the app context."""
+    db = g.pop('db', None)
+    if db is not None:
+        db.close()
+
+def init_db():
+    """
+    Creates the users table and seeds the demo account if it does not exist yet.
+    """
+    db = sqlite3.connect(app.config['USERS_DB'])
+    try:
+        db.execute('PRAGMA journal_mode=WAL')
+        with db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS users ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'username TEXT NOT NULL, '
+                'password_hash TEXT NOT NULL)'
+            )
+            db.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users(username)')
+            if db.execute('SELECT 1 FROM users WHERE username = ?', ('testuser',)).fetchone() is None:
+                db.execute('INSERT INTO users(username, password_hash) VALUES (?, ?)',
+                           ('testuser', generate_password_hash('password123')))
+    finally:
+        db.close()
+
+init_db()
+
+# The cached lookups below raise LookupError on a miss instead of returning None,
+# because lru_cache does not cache exceptions. A name that is registered later
+# (possibly by another worker) is therefore never served as a stale miss.
+# _user_by_id hands the same cached User object to every request for that user,
+# so these objects are treated as read-only: nothing may set attributes on them.
+
+@lru_cache(maxsize=1024)
+def _user_row_by_username(username):
+    """
+    Returns (user_id, password_hash) for a username. Raises LookupError if it is not registered.
+    """
+    row = get_db().execute('SELECT id, password_hash FROM users WHERE username = ?', (username,)).fetchone()
+    if row is None:
+        raise LookupError(username)
+    return str(row['id']), row['password_hash']
+
+@lru_cache(maxsize=1024)
+def _user_by_id(user_id):
+    """
+    Returns the shared, read-only User for a user ID. Raises LookupError if there is no such user.
+    """
+    row = get_db().execute('SELECT username, password_hash FROM users WHERE id = ?', (user_id,)).fetchone()
+    if row is None:
+        raise LookupError(user_id)
+    return User(user_id, row['username'], row['password_hash'])
+
+def find_user_by_username(username):
+    """
+    Returns (user_id, password_hash) for the given username, or None if it is not registered.
+    """
+    try:
+        return _user_row_by_username(username)
+    except LookupError:
+        return None
+
+def run_off_event_loop(func, *args):
+    """
+    Runs a CPU-heavy call (password hashing) on gevent's native thread pool when the
+    app is served by gevent workers, so other greenlets keep running meanwhile;
+    hashlib's scrypt/pbkdf2 release the GIL. Without gevent, calls func directly.
+    """
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('socket'):
+        import gevent
+        return gevent.get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+# Short-lived cache of successful password checks, so a burst of logins with the same
+# credentials does not re-run the deliberately slow hash derivation every time.
+# Keyed by (username, stored password hash): a password change yields a new key, so
+# stale entries can never match. Only successes are cached, so wrong guesses always
+# pay the full cost. The cache is per worker process.
+_password_cache = TTLCache(maxsize=1024, ttl=60)
+_password_cache_lock = threading.Lock()
+
+def verify_password(username, password_hash, password):
+    """
+    Checks a password against its stored hash, consulting the short-lived cache first.
+    """
+    key = (username, password_hash)
+    digest = hashlib.sha256(password.encode()).digest()
+    with _password_cache_lock:
+        cached_digest = _password_cache.get(key)
+    if cached_digest is not None and hmac.compare_digest(cached_digest, digest):
+        return True
+    if run_off_event_loop(check_password_hash, password_hash, password):
+        with _password_cache_lock:
+            _password_cache[key] = digest
+        return True
+    return False
 
 # User class for Flask-Login
 class User(UserMixin):
@@ -47,13 +178,10 @@ class User(UserMixin):
     @staticmethod
     def get(user_id):
         """Static method to retrieve a user by ID."""
-        for user_data in users.values():
-            if user_data['id'] == user_id:
-                # Find username by ID
-                for username, data in users.items():
-                    if data['id'] == user_id:
-                        return User(user_data['id'], username, user_data['password_hash'])
-        return None
+        try:
+            return _user_by_id(user_id)
+        except LookupError:
+            return None
 
     def get_id(self):
         """Returns the unique ID of the user."""
@@ -81,36 +209,131 @@ def find_folder_by_path(path):
     """
     Traverses the file system tree to find a specific folder by its path.
     Assumes path starts with '/root' or 'root'.
+    Lookups are memoized; see _resolve_folder_path.
     """
-    # Handle both '/root' and 'root' as starting points
-    if path.startswith('/root'):
-        segments = [s for s in path.split('/') if s]
-    elif path == 'root': # Directly accessing root
-        segments = ['root']
-    else:
-        # print(f"DEBUG: Path '{path}' does not start with /root or is not 'root'.")
-        return None
+    return _resolve_folder_path(path)
 
-    if not segments or segments[0] != 'root':
-        # print(f"DEBUG: Invalid path format or not starting with root: {segments}")
+@lru_cache(maxsize=4096)
+def _resolve_folder_path(path):
+    """
+    Resolves a path string to its Folder by descending through child dicts.
+    Cached per path, so it must be cleared with _resolve_folder_path.cache_clear()
+    whenever a folder is added or removed.
+    """
+    segments = path.removeprefix('/').split('/')
+    if segments[0] != 'root':
         return None
 
     current_folder = root_folder
     for segment in segments[1:]:
-        if segment in current_folder.children_folders:
-            current_folder = current_folder.children_folders[segment]
-        else:
-            # print(f"DEBUG: Segment '{segment}' not found in '{current_folder.name}' children.")
+        if not segment: # Tolerate repeated or trailing slashes
+            continue
+        current_folder = current_folder.children_folders.get(segment)
+        if current_folder is None:
             return None
-    # print(f"DEBUG: Found folder for path '{path}': {current_folder.name}")
     return current_folder
 
-def serialize_folder_to_dict(folder):
+def ojsonify(**kwargs):
+    """
+    Drop-in replacement for Flask's jsonify that serializes with orjson,
+    which is considerably faster than the stdlib json module on large payloads.
+    """
+    return app.response_class(orjson.dumps(kwargs), mimetype='application/json')
+
+def get_request_json():
+    """
+    Parses the JSON body of the current request with orjson.
+    Aborts with 400 if the body is not valid JSON.
+    """
+    try:
+        return orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        abort(400)
+
+def invalidate_file_system_cache():
     """
-    Recursively converts a Folder object and its contents into a dictionary
-    suitable for JSON serialization and frontend display.
+    Discards the cached /get_file_system payload. Must be called after any
+    change to the folder tree.
     """
-    return folder.to_dict()
+    global _fs_cache, _fs_generation
+    _fs_cache = None
+    _fs_generation += 1
+
+def stream_file_system():
+    """
+    Returns a generator streaming the /get_file_system response. If the tree did
+    not change while streaming, the encoded bytes are kept as the cached payload.
+    The first chunk is encoded before returning, so an early failure still raises
+    to get_file_system, which answers with a 500 error payload.
+    """
+    generation = _fs_generation
+    parts = root_folder.iter_json()
+    chunks = [b'{"success":true,"file_system":' + next(parts)]
+
+    def generate():
+        global _fs_cache
+        yield chunks[0]
+        try:
+            for chunk in parts:
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            # The 200 status is already sent. Re-raising makes the server abort the
+            # connection, so the client sees a failed request, not truncated JSON.
+            print(f"Error streaming file system: {e}")
+            raise
+        chunks.append(b'}')
+        yield b'}'
+        if generation == _fs_generation:
+            _fs_cache = b''.join(chunks)
+
+    return generate()
+
+def publish_file_system_delta(delta):
+    """
+    Pushes a file-system delta to every client connected to /fs_stream.
+    A delta is either {'op': 'add', 'parent_path': ..., 'node': {...}}
+    or {'op': 'delete', 'parent_path': ..., 'node_type': 'file'|'folder', 'name': ...}.
+    A subscriber whose queue is full is dropped: its stream is told to close,
+    and the client's EventSource reconnects and reloads the tree.
+    """
+    payload = orjson.dumps(delta)
+    for subscriber in list(_fs_subscribers):
+        try:
+            subscriber.put_nowait(payload)
+        except queue.Full:
+            _drop_fs_subscriber(subscriber)
+
+def _drop_fs_subscriber(subscriber):
+    """
+    Unregisters a lagging /fs_stream client and replaces its backlog with a None
+    marker that makes its event stream end.
+    """
+    try:
+        _fs_subscribers.remove(subscriber)
+    except ValueError:
+        return # Already gone
+    try:
+        while True:
+            subscriber.get_nowait()
+    except queue.Empty:
+        pass
+    subscriber.put_nowait(None)
+
+# Rendered HTML of pages that only vary by their flashed messages, keyed by template name
+_page_cache = {}
+
+def render_auth_page(template_name):
+    """
+    Renders the login/register pages. Plain GETs with no flashed messages always
+    produce the same HTML, so that render is cached and reused.
+    """
+    if request.method != 'GET' or get_flashed_messages():
+        return render_template(template_name)
+    html = _page_cache.get(template_name)
+    if html is None:
+        html = _page_cache[template_name] = render_template(template_name)
+    return html
 
 # --- Flask Routes ---
 
@@ -137,9 +360,9 @@ def login():
         password = request.form.get('password')
         # print(f"DEBUG: Login attempt for username: {username}")
 
-        user_data = users.get(username)
-        if user_data and check_password_hash(user_data['password_hash'], password):
-            user = User(user_data['id'], username, user_data['password_hash'])
+        user_data = find_user_by_username(username)
+        if user_data and verify_password(username, user_data[1], password or ''):
+            user = User(user_data[0], username, user_data[1])
             login_user(user)
             # print(f"DEBUG: User '{username}' logged in successfully.")
             flash('Logged in successfully!', 'success')
@@ -148,7 +371,7 @@ def login():
         else:
             # print(f"DEBUG: Login failed for username: {username}")
             flash('Invalid username or password.', 'error')
-    return render_template('login.html')
+    return render_auth_page('login.html')
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -158,31 +381,27 @@ def register():
     if current_user.is_authenticated:
         return redirect(url_for('index'))
 
-    global next_user_id # Declare as global to modify it
-
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
 
         if not username or not password:
             flash('Username and password are required.', 'error')
-            return render_template('register.html')
-
-        if username in users:
+            return render_auth_page('register.html')
+
+        hashed_password = run_off_event_loop(generate_password_hash, password)
+        db = get_db()
+        try:
+            with db:
+                db.execute('INSERT INTO users(username, password_hash) VALUES (?, ?)', (username, hashed_password))
+        except sqlite3.IntegrityError: # The unique index on username rejected a duplicate
             flash('Username already exists. Please choose a different one.', 'error')
-            return render_template('register.html')
-
-        hashed_password = generate_password_hash(password)
-        users[username] = {
-            'password_hash': hashed_password,
-            'id': str(next_user_id)
-        }
-        next_user_id += 1
-        # print(f"DEBUG: User '{username}' registered successfully with ID: {users[username]['id']}")
+            return render_auth_page('register.html')
+        # print(f"DEBUG: User '{username}' registered successfully.")
         flash('Registration successful! Please log in.', 'success')
         return redirect(url_for('login'))
 
-    return render_template('register.html')
+    return render_auth_page('register.html')
 
 
 @app.route('/logout')
@@ -204,11 +423,43 @@ def get_file_system():
     API endpoint to retrieve the current state of the file system.
     """
     try:
-        file_system_data = serialize_folder_to_dict(root_folder)
-        return jsonify(success=True, file_system=file_system_data)
+        if _fs_cache is None:
+            # Serialize and send in one pass; the stream fills the cache as it goes
+            return Response(stream_file_system(), mimetype='application/json')
+        return app.response_class(_fs_cache, mimetype='application/json')
     except Exception as e:
         print(f"Error getting file system: {e}")
-        return jsonify(success=False, message=str(e)), 500
+        return ojsonify(success=False, message=str(e)), 500
+
+@app.route('/fs_stream')
+@login_required
+def fs_stream():
+    """
+    Server-Sent Events endpoint that pushes file-system deltas to the client
+    as they happen, so the UI can patch its tree instead of refetching it.
+    """
+    def event_stream():
+        # Registered only once the body is actually iterated, so HEAD requests and
+        # clients that disconnect before the first chunk never leave a queue behind
+        subscriber = queue.Queue(maxsize=FS_STREAM_QUEUE_SIZE)
+        try:
+            _fs_subscribers.append(subscriber)
+            yield b": connected\n\n" # Flushes the headers without waiting for a delta
+            while True:
+                try:
+                    payload = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield b": keep-alive\n\n" # Comment line keeps idle connections open
+                    continue
+                if payload is None: # Dropped by publish_file_system_delta for falling behind
+                    return
+                yield b"data: " + payload + b"\n\n"
+        finally:
+            if subscriber in _fs_subscribers:
+                _fs_subscribers.remove(subscriber)
+
+    return Response(event_stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/create_folder', methods=['POST'])
 @login_required # Protect this route
@@ -216,28 +467,32 @@ def create_folder():
     """
     API endpoint to create a new folder.
     """
-    data = request.get_json()
+    data = get_request_json()
     folder_name = data.get('folder_name')
     parent_path = data.get('parent_path')
 
     if not folder_name:
-        return jsonify(success=False, message="Folder name is required."), 400
+        return ojsonify(success=False, message="Folder name is required."), 400
     if not parent_path:
-        return jsonify(success=False, message="Parent path is required."), 400
+        return ojsonify(success=False, message="Parent path is required."), 400
 
     parent_folder = find_folder_by_path(parent_path)
     if not parent_folder:
-        return jsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
+        return ojsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
 
     try:
         new_folder = parent_folder.add_folder(folder_name)
         if new_folder:
-            return jsonify(success=True, message=f"Folder '{folder_name}' created."), 201
+            invalidate_file_system_cache()
+            _resolve_folder_path.cache_clear()
+            delta = {'op': 'add', 'parent_path': parent_folder.get_path(), 'node': new_folder.to_dict()}
+            publish_file_system_delta(delta)
+            return ojsonify(success=True, message=f"Folder '{folder_name}' created.", delta=delta), 201
         else:
-            return jsonify(success=False, message=f"Folder '{folder_name}' already exists in '{parent_path}'."), 409
+            return ojsonify(success=False, message=f"Folder '{folder_name}' already exists in '{parent_path}'."), 409
     except Exception as e:
         print(f"Error creating folder: {e}")
-        return jsonify(success=False, message=f"An error occurred: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred: {str(e)}"), 500
 
 @app.route('/delete_folder', methods=['POST'])
 @login_required # Protect this route
@@ -245,39 +500,43 @@ def delete_folder():
     """
     API endpoint to delete a folder and move it to the recycle bin.
     """
-    data = request.get_json()
+    data = get_request_json()
     folder_name = data.get('folder_name')
     parent_path = data.get('parent_path')
 
     # print(f"Backend: Received delete folder request for folder_name='{folder_name}', parent_path='{parent_path}'")
 
     if not folder_name:
-        return jsonify(success=False, message="Folder name is required."), 400
+        return ojsonify(success=False, message="Folder name is required."), 400
     if not parent_path:
-        return jsonify(success=False, message="Parent path is required."), 400
+        return ojsonify(success=False, message="Parent path is required."), 400
 
     # Prevent deleting the root folder itself
     if folder_name == 'root' and (parent_path == '/root' or parent_path == 'root'):
-        return jsonify(success=False, message="Cannot delete the root folder."), 403
+        return ojsonify(success=False, message="Cannot delete the root folder."), 403
 
     parent_folder = find_folder_by_path(parent_path)
     if not parent_folder:
         # print(f"Backend: Parent folder not found for path: {parent_path}")
-        return jsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
+        return ojsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
 
     try:
         # print(f"Backend: Attempting to delete folder '{folder_name}' from parent '{parent_folder.name}'")
         deleted_item_data, original_path = parent_folder.delete_folder(folder_name)
         if deleted_item_data:
             recycle_bin.add_item(original_path, deleted_item_data)
+            invalidate_file_system_cache()
+            _resolve_folder_path.cache_clear()
+            delta = {'op': 'delete', 'parent_path': parent_folder.get_path(), 'node_type': 'folder', 'name': folder_name}
+            publish_file_system_delta(delta)
             # print(f"Backend: Folder '{folder_name}' moved to Recycle Bin.")
-            return jsonify(success=True, message=f"Folder '{folder_name}' moved to Recycle Bin."), 200
+            return ojsonify(success=True, message=f"Folder '{folder_name}' moved to Recycle Bin.", delta=delta), 200
         else:
             # print(f"Backend: Folder '{folder_name}' not found in '{parent_path}' for deletion.")
-            return jsonify(success=False, message=f"Folder '{folder_name}' not found in '{parent_path}'."), 404
+            return ojsonify(success=False, message=f"Folder '{folder_name}' not found in '{parent_path}'."), 404
     except Exception as e:
         print(f"Backend: Error deleting folder: {e}")
-        return jsonify(success=False, message=f"An error occurred: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred: {str(e)}"), 500
 
 @app.route('/add_file', methods=['POST'])
 @login_required # Protect this route
@@ -285,7 +544,7 @@ def add_file():
     """
     API endpoint to add a new file to a folder, including metadata.
     """
-    data = request.get_json()
+    data = get_request_json()
     file_name = data.get('file_name')
     parent_path = data.get('parent_path')
     author = data.get('author', '')
@@ -294,24 +553,27 @@ def add_file():
     file_type = data.get('file_type', '').lower() # Convert to lowercase for consistency
 
     if not file_name:
-        return jsonify(success=False, message="File name is required."), 400
+        return ojsonify(success=False, message="File name is required."), 400
     if not parent_path:
-        return jsonify(success=False, message="Parent path is required."), 400
+        return ojsonify(success=False, message="Parent path is required."), 400
 
     parent_folder = find_folder_by_path(parent_path)
     if not parent_folder:
-        return jsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
+        return ojsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
 
     try:
         new_file_obj = File(file_name, "", author, None, tags, file_type) # Content is placeholder for now
         added_file = parent_folder.add_file(new_file_obj)
         if added_file:
-            return jsonify(success=True, message=f"File '{file_name}' added."), 201
+            invalidate_file_system_cache()
+            delta = {'op': 'add', 'parent_path': parent_folder.get_path(), 'node': added_file.to_dict()}
+            publish_file_system_delta(delta)
+            return ojsonify(success=True, message=f"File '{file_name}' added.", delta=delta), 201
         else:
-            return jsonify(success=False, message=f"File '{file_name}' already exists in '{parent_path}'."), 409
+            return ojsonify(success=False, message=f"File '{file_name}' already exists in '{parent_path}'."), 409
     except Exception as e:
         print(f"Error adding file: {e}")
-        return jsonify(success=False, message=f"An error occurred: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred: {str(e)}"), 500
 
 @app.route('/delete_file', methods=['POST'])
 @login_required # Protect this route
@@ -319,67 +581,69 @@ def delete_file():
     """
     API endpoint to delete a file from a folder and move it to the recycle bin.
     """
-    data = request.get_json()
+    data = get_request_json()
     file_name = data.get('file_name')
     parent_path = data.get('parent_path')
 
     # print(f"Backend: Received delete file request for file_name='{file_name}', parent_path='{parent_path}'")
 
     if not file_name:
-        return jsonify(success=False, message="File name is required."), 400
+        return ojsonify(success=False, message="File name is required."), 400
     if not parent_path:
-        return jsonify(success=False, message="Parent path is required."), 400
+        return ojsonify(success=False, message="Parent path is required."), 400
 
     parent_folder = find_folder_by_path(parent_path)
     if not parent_folder:
         # print(f"Backend: Parent folder not found for path: {parent_path}")
-        return jsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
+        return ojsonify(success=False, message=f"Parent folder not found at path: {parent_path}"), 404
 
     try:
         # print(f"Backend: Attempting to delete file '{file_name}' from parent '{parent_folder.name}'")
         deleted_item_data, original_path = parent_folder.delete_file(file_name)
         if deleted_item_data:
             recycle_bin.add_item(original_path, deleted_item_data)
+            invalidate_file_system_cache()
+            delta = {'op': 'delete', 'parent_path': parent_folder.get_path(), 'node_type': 'file', 'name': file_name}
+            publish_file_system_delta(delta)
             # print(f"Backend: File '{file_name}' moved to Recycle Bin.")
-            return jsonify(success=True, message=f"File '{file_name}' moved to Recycle Bin."), 200
+            return ojsonify(success=True, message=f"File '{file_name}' moved to Recycle Bin.", delta=delta), 200
         else:
             # print(f"Backend: File '{file_name}' not found in '{parent_path}' for deletion.")
-            return jsonify(success=False, message=f"File '{file_name}' not found in '{parent_path}'."), 404
+            return ojsonify(success=False, message=f"File '{file_name}' not found in '{parent_path}'."), 404
     except Exception as e:
         print(f"Backend: Error deleting file: {e}")
-        return jsonify(success=False, message=f"An error occurred: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred: {str(e)}"), 500
 
 @app.route('/search_file', methods=['POST'])
 @login_required # Protect this route
 def search_file():
     """
-    API endpoint to search for a file within a specific folder using binary search.
+    API endpoint to search for a file within a specific folder by name.
     This is for name-only search within a specified folder.
     """
-    data = request.get_json()
+    data = get_request_json()
     file_name = data.get('file_name')
     parent_path = data.get('parent_path')
 
     if not file_name:
-        return jsonify(success=False, message="File name is required for search."), 400
+        return ojsonify(success=False, message="File name is required for search."), 400
     if not parent_path:
-        return jsonify(success=False, message="Parent path is required for search scope."), 400
+        return ojsonify(success=False, message="Parent path is required for search scope."), 400
 
     parent_folder = find_folder_by_path(parent_path)
     if not parent_folder:
-        return jsonify(success=False, message=f"Folder not found at path: {parent_path}"), 404
+        return ojsonify(success=False, message=f"Folder not found at path: {parent_path}"), 404
 
     try:
-        sorted_files = parent_folder.get_sorted_files_by_name()
-        found_file = binary_search_files(sorted_files, file_name)
+        found_file = parent_folder.get_file_by_name(file_name)
 
         if found_file:
-            return jsonify(success=True, message=f"File '{file_name}' found.", found_in_path=parent_path), 200
+            return ojsonify(success=True, message=f"File '{file_name}' found.", found_in_path=parent_path), 200
         else:
-            return jsonify(success=False, message=f"File '{file_name}' not found in '{parent_path}'."), 404
+            return ojsonify(success=False, message=f"File '{file_name}' not found in '{parent_path}'."), 404
     except Exception as e:
         print(f"Error searching file: {e}")
-        return jsonify(success=False, message=f"An error occurred: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred: {str(e)}"), 500
 
 @app.route('/search_by_metadata', methods=['POST'])
 @login_required
@@ -387,52 +651,39 @@ def search_by_metadata():
     """
     API endpoint to search for files based on various metadata fields across the entire file system.
     """
-    data = request.get_json()
+    data = get_request_json()
     search_name = data.get('name', '').lower()
     search_author = data.get('author', '').lower()
     search_tags_str = data.get('tags', '')
-    search_tags = [tag.strip().lower() for tag in search_tags_str.split(',') if tag.strip()]
+    search_tags_set = frozenset(tag.strip().lower() for tag in search_tags_str.split(',') if tag.strip())
     search_file_type = data.get('file_type', '').lower()
 
-    found_files = []
-    # Use the helper to get all files from the root
-    all_files_in_system, _ = traverse_and_collect_all_items(root_folder)
-
-    for file_obj in all_files_in_system:
-        match = True
-
-        if search_name and search_name not in file_obj.name.lower():
-            match = False
-        if search_author and search_author not in file_obj.author.lower():
-            match = False
-        if search_file_type and search_file_type != file_obj.file_type.lower():
-            match = False
-        if search_tags:
-            # Check if all search tags are present in file_obj.tags
-            file_obj_tags_lower = [t.lower() for t in file_obj.tags]
-            if not all(tag in file_obj_tags_lower for tag in search_tags):
-                match = False
-
-        if match:
-            # To get the full path for the frontend display
-            # This is inefficient for large systems but works for demonstration
-            # A reverse mapping or storing path in File object would be better.
-            full_path = "Unknown Path"
-            # Iteratively find the parent to construct full path
-            queue = [root_folder]
-            while queue:
-                current_f = queue.pop(0)
-                if current_f.get_file_by_name(file_obj.name) == file_obj:
-                    full_path = f"{current_f.get_path()}/{file_obj.name}"
-                    break
-                for child_f in current_f.children_folders.values():
-                    queue.append(child_f)
-
-            file_data = file_obj.to_dict()
-            file_data['full_path'] = full_path # Add full path for display
-            found_files.append(file_data)
-
-    return jsonify(success=True, results=found_files), 200
+    if search_name:
+        # Only the name-index buckets whose key contains the search term can match
+        candidate_files = [file_obj for name_key, bucket in files_by_name.items()
+                           if search_name in name_key for file_obj in bucket]
+    elif search_author:
+        # Likewise for authors: each distinct author is tested once, not once per file
+        candidate_files = [file_obj for author_key, bucket in files_by_author.items()
+                           if search_author in author_key for file_obj in bucket]
+    else:
+        # Use the helper to get all files from the root
+        candidate_files, _ = traverse_and_collect_all_items(root_folder)
+
+    # Filter, build the full path and convert to dict in a single pass.
+    # Every file keeps a reference to its containing folder,
+    # so the full path is a walk up the parent chain.
+    found_files = [
+        {**file_obj.to_dict(),
+         'full_path': f"{file_obj.parent.get_path()}/{file_obj.name}" if file_obj.parent else "Unknown Path"}
+        for file_obj in candidate_files
+        if (not search_name or search_name in file_obj._name_lower)
+        and (not search_author or search_author in file_obj._author_lower)
+        and (not search_file_type or search_file_type == file_obj._type_lower)
+        and search_tags_set <= file_obj._tags_lower_set
+    ]
+
+    return ojsonify(success=True, results=found_files), 200
 
 # --- Recycle Bin Endpoints ---
 
@@ -442,28 +693,27 @@ def get_recycle_bin_items():
     """API endpoint to retrieve contents of the recycle bin."""
     try:
         items = recycle_bin.get_all_items()
-        return jsonify(success=True, items=items), 200
+        return ojsonify(success=True, items=items), 200
     except Exception as e:
         print(f"Error getting recycle bin items: {e}")
-        return jsonify(success=False, message=str(e)), 500
+        return ojsonify(success=False, message=str(e)), 500
 
 @app.route('/restore_from_recycle_bin', methods=['POST'])
 @login_required
 def restore_from_recycle_bin():
     """API endpoint to restore an item from the recycle bin."""
-    data = request.get_json()
-    item_index = data.get('item_index')
+    data = get_request_json()
+    item_id = data.get('item_id')
 
-    if item_index is None:
-        return jsonify(success=False, message="Item index is required."), 400
+    if item_id is None:
+        return ojsonify(success=False, message="Item ID is required."), 400
 
     try:
-        item = recycle_bin.get_item(item_index)
+        item = recycle_bin.get_item(item_id)
         if not item:
-            return jsonify(success=False, message="Item not found in recycle bin."), 404
+            return ojsonify(success=False, message="Item not found in recycle bin."), 404
 
-        original_path = item['original_path']
-        item_data = item['item_data']
+        original_path, item_data = item
         item_type = item_data['type']
         item_name = item_data['name']
 
@@ -474,98 +724,90 @@ def restore_from_recycle_bin():
         elif len(path_parts) == 2 and path_parts[1] == 'root': # special case for /root itself, should not happen for items within it.
             parent_path = 'root' # Restoring directly into root is handled by finding root_folder
             if item_name == 'root': # Cannot restore root into itself
-                return jsonify(success=False, message="Cannot restore the original root folder as a child."), 400
+                return ojsonify(success=False, message="Cannot restore the original root folder as a child."), 400
         elif len(path_parts) == 2: # e.g., /root/file.txt -> parent is /root
              parent_path = '/root'
         else:
-             return jsonify(success=False, message="Invalid original path for restoration."), 400
+             return ojsonify(success=False, message="Invalid original path for restoration."), 400
 
         parent_folder = find_folder_by_path(parent_path)
 
         if not parent_folder:
-            return jsonify(success=False, message=f"Original parent folder '{parent_path}' not found. Cannot restore."), 404
+            return ojsonify(success=False, message=f"Original parent folder '{parent_path}' not found. Cannot restore."), 404
 
         # Check if an item with the same name already exists in the target location
         if item_type == 'file' and parent_folder.get_file_by_name(item_name):
-            return jsonify(success=False, message=f"A file named '{item_name}' already exists in '{parent_path}'. Please rename existing file or restore manually."), 409
+            return ojsonify(success=False, message=f"A file named '{item_name}' already exists in '{parent_path}'. Please rename existing file or restore manually."), 409
         elif item_type == 'folder' and parent_folder.get_folder_by_name(item_name):
-            return jsonify(success=False, message=f"A folder named '{item_name}' already exists in '{parent_path}'. Please rename existing folder or restore manually."), 409
+            return ojsonify(success=False, message=f"A folder named '{item_name}' already exists in '{parent_path}'. Please rename existing folder or restore manually."), 409
 
 
         # Perform restoration based on item type
         if item_type == 'file':
-            restored_file = File(
-                item_data['name'],
-                item_data.get('content', ''),
-                item_data.get('author', ''),
-                item_data.get('created_date'),
-                item_data.get('tags', []),
-                item_data.get('file_type', '')
-            )
-            parent_folder.add_file(restored_file)
+            restored_file = File.from_dict(item_data)
+            restored_node = parent_folder.add_file(restored_file)
         elif item_type == 'folder':
-            # Recursive function to restore folders and their contents
-            def restore_folder_recursive(target_parent_folder, folder_data):
+            # Restore the folder and its contents iteratively, using an explicit
+            # stack of (target parent folder, folder data) pairs instead of recursion
+            restored_node = None
+            stack = [(parent_folder, item_data)]
+            while stack:
+                target_parent_folder, folder_data = stack.pop()
                 new_folder = target_parent_folder.add_folder(folder_data['name'])
                 if not new_folder: # Should not happen if existence check passed above
-                    return None
-                for file_in_folder_data in folder_data['files']:
-                    new_file = File(
-                        file_in_folder_data['name'],
-                        file_in_folder_data.get('content', ''),
-                        file_in_folder_data.get('author', ''),
-                        file_in_folder_data.get('created_date'),
-                        file_in_folder_data.get('tags', []),
-                        file_in_folder_data.get('file_type', '')
-                    )
-                    new_folder.add_file(new_file)
-                for child_folder_data in folder_data['children']:
-                    restore_folder_recursive(new_folder, child_folder_data)
-                return new_folder
-
-            restore_folder_recursive(parent_folder, item_data)
+                    continue
+                if restored_node is None:
+                    restored_node = new_folder # The top-level restored folder
+                new_folder.bulk_add_files([File.from_dict(file_in_folder_data) for file_in_folder_data in folder_data['files']])
+                stack.extend((new_folder, child_folder_data) for child_folder_data in folder_data['children'])
+            _resolve_folder_path.cache_clear()
+
+        invalidate_file_system_cache()
+        delta = {'op': 'add', 'parent_path': parent_folder.get_path(), 'node': restored_node.to_dict()}
+        publish_file_system_delta(delta)
 
         # Remove from recycle bin after successful restoration
-        recycle_bin.remove_item(item_index)
-        return jsonify(success=True, message=f"'{item_name}' restored to '{parent_path}'."), 200
+        recycle_bin.remove_item(item_id)
+        return ojsonify(success=True, message=f"'{item_name}' restored to '{parent_path}'.", delta=delta), 200
 
     except Exception as e:
         print(f"Error restoring item: {e}")
-        return jsonify(success=False, message=f"An error occurred during restoration: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred during restoration: {str(e)}"), 500
 
 @app.route('/permanent_delete_item', methods=['POST'])
 @login_required
 def permanent_delete_item():
     """API endpoint to permanently delete an item from the recycle bin."""
-    data = request.get_json()
-    item_index = data.get('item_index')
+    data = get_request_json()
+    item_id = data.get('item_id')
 
-    if item_index is None:
-        return jsonify(success=False, message="Item index is required."), 400
+    if item_id is None:
+        return ojsonify(success=False, message="Item ID is required."), 400
 
     try:
-        deleted_item = recycle_bin.remove_item(item_index)
+        deleted_item = recycle_bin.remove_item(item_id)
         if deleted_item:
-            item_name = deleted_item['item_data']['name']
-            return jsonify(success=True, message=f"'{item_name}' permanently deleted."), 200
+            item_name = deleted_item[1]['name']
+            return ojsonify(success=True, message=f"'{item_name}' permanently deleted."), 200
         else:
-            return jsonify(success=False, message="Item not found in recycle bin for permanent deletion."), 404
+            return ojsonify(success=False, message="Item not found in recycle bin for permanent deletion."), 404
     except Exception as e:
         print(f"Error permanently deleting item: {e}")
-        return jsonify(success=False, message=f"An error occurred: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred: {str(e)}"), 500
 
 @app.route('/empty_recycle_bin', methods=['POST'])
 @login_required
 def empty_recycle_bin():
     """API endpoint to empty the entire recycle bin."""
     try:
-        recycle_bin.items = [] # Clear all items
-        return jsonify(success=True, message="Recycle Bin emptied successfully."), 200
+        recycle_bin.clear() # Clear all items
+        return ojsonify(success=True, message="Recycle Bin emptied successfully."), 200
     except Exception as e:
         print(f"Error emptying recycle bin: {e}")
-        return jsonify(success=False, message=f"An error occurred: {str(e)}"), 500
+        return ojsonify(success=False, message=f"An error occurred: {str(e)}"), 500
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server only. In production, serve through wsgi.py with gunicorn.
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1')
 
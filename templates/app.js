@@ -8,6 +8,7 @@ let selectedRecycleBinItemIndex = -1; // To track selected item in recycle bin m
 // Define Flask endpoint URLs using window.location.origin for robustness
 const baseUrl = window.location.origin;
 const getFileSystemUrl = `${baseUrl}/get_file_system`;
+const fsStreamUrl = `${baseUrl}/fs_stream`; // Server-Sent Events stream of file system deltas
 const createFolderUrl = `${baseUrl}/create_folder`;
 const deleteFolderUrl = `${baseUrl}/delete_folder`;
 const addFileUrl = `${baseUrl}/add_file`;
@@ -96,11 +97,7 @@ async function fetchFileSystem() {
         const data = await response.json();
         if (data.success) {
             fileSystemData = data.file_system;
-            // Start at level 0 for root
-            const fullFileSystemHtml = renderFileSystemRecursive(fileSystemData, 0);
-            // Update the display area only once at the top level
-            document.getElementById('fileSystemDisplay').innerHTML = fullFileSystemHtml;
-            populateFolderDropdowns(fileSystemData);
+            renderFileSystem();
             hideSearchResults(); // Hide search results when file system is reloaded
         } else {
             showMessage('Failed to load file system: ' + data.message, 'error');
@@ -111,6 +108,75 @@ async function fetchFileSystem() {
     }
 }
 
+/**
+ * Re-renders the file system display and folder dropdowns from fileSystemData.
+ */
+function renderFileSystem() {
+    // Start at level 0 for root
+    const fullFileSystemHtml = renderFileSystemRecursive(fileSystemData, 0);
+    // Update the display area only once at the top level
+    document.getElementById('fileSystemDisplay').innerHTML = fullFileSystemHtml;
+    populateFolderDropdowns(fileSystemData);
+}
+
+/**
+ * Finds a folder node in the local fileSystemData tree by its path.
+ * @param {string} path - Folder path such as '/root/docs'.
+ * @returns {object|null} The folder node, or null if it is not in the local tree.
+ */
+function findFolderNode(path) {
+    const segments = path.split('/').filter(segment => segment);
+    if (segments[0] !== fileSystemData.name) {
+        return null;
+    }
+    let node = fileSystemData;
+    for (const segment of segments.slice(1)) {
+        node = node.children.find(child => child.name === segment);
+        if (!node) {
+            return null;
+        }
+    }
+    return node;
+}
+
+/**
+ * Applies a file system delta sent by the server to the local tree and re-renders it,
+ * instead of refetching the whole tree. Applying the same delta twice is harmless.
+ * @param {object} delta - {op: 'add', parent_path, node} or {op: 'delete', parent_path, node_type, name}.
+ */
+function applyFileSystemDelta(delta) {
+    const parent = findFolderNode(delta.parent_path);
+    if (!parent) {
+        fetchFileSystem(); // Local tree is out of sync, fall back to a full refresh
+        return;
+    }
+    const nodeType = delta.op === 'add' ? delta.node.type : delta.node_type;
+    const name = delta.op === 'add' ? delta.node.name : delta.name;
+    const key = nodeType === 'folder' ? 'children' : 'files';
+    const siblings = parent[key].filter(item => item.name !== name);
+    if (delta.op === 'add') {
+        siblings.push(delta.node);
+        siblings.sort((a, b) => (a.name < b.name ? -1 : a.name > b.name ? 1 : 0));
+    }
+    parent[key] = siblings;
+    renderFileSystem();
+}
+
+/**
+ * Subscribes to the server's file system change stream so changes made
+ * elsewhere (e.g. another tab) are patched into the local tree.
+ */
+function subscribeToFileSystemChanges() {
+    const source = new EventSource(fsStreamUrl);
+    source.onmessage = (event) => applyFileSystemDelta(JSON.parse(event.data));
+    let connectedBefore = false;
+    source.onopen = () => {
+        // Deltas sent while disconnected were missed, so reload the whole tree on reconnect
+        if (connectedBefore) fetchFileSystem();
+        connectedBefore = true;
+    };
+}
+
 /**
  * Recursively renders the file system structure as an HTML string.
  * @param {object} node - The current folder/file node to render.
@@ -242,7 +308,7 @@ async function createFolder() {
         if (data.success) {
             showMessage(`Folder '${folderName}' created successfully in '${parentPath}'.`, 'success');
             document.getElementById('folderName').value = ''; // Clear input
-            fetchFileSystem(); // Refresh the display
+            applyFileSystemDelta(data.delta); // Patch the local tree instead of refetching it
         } else {
             showMessage('Error creating folder: ' + data.message, 'error');
         }
@@ -285,7 +351,7 @@ async function deleteFolder() {
         if (data.success) {
             showMessage(`Folder '${folderName}' moved to Recycle Bin from '${parentPath}'.`, 'success');
             document.getElementById('folderName').value = ''; // Clear input
-            fetchFileSystem(); // Refresh the display
+            applyFileSystemDelta(data.delta); // Patch the local tree instead of refetching it
         } else {
             showMessage('Error deleting folder: ' + data.message, 'error');
         }
@@ -330,7 +396,7 @@ async function addFile() {
             document.getElementById('fileAuthor').value = '';
             document.getElementById('fileTags').value = '';
             document.getElementById('fileType').value = '';
-            fetchFileSystem(); // Refresh the display
+            applyFileSystemDelta(data.delta); // Patch the local tree instead of refetching it
         } else {
             showMessage('Error adding file: ' + data.message, 'error');
         }
@@ -367,7 +433,7 @@ async function deleteFile() {
         const data = await response.json();
         if (data.success) {
             showMessage(`File '${fileName}' moved to Recycle Bin from '${parentPath}'.`, 'success');
-            fetchFileSystem(); // Refresh the display
+            applyFileSystemDelta(data.delta); // Patch the local tree instead of refetching it
         } else {
             showMessage('Error deleting file: ' + data.message, 'error');
         }
@@ -556,13 +622,13 @@ async function restoreRecycleBinItem() {
         const response = await fetch(restoreFromRecycleBinUrl, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ item_index: selectedRecycleBinItemIndex })
+            body: JSON.stringify({ item_id: recycleBinItems[selectedRecycleBinItemIndex].item_id })
         });
         const data = await response.json();
         if (data.success) {
             showMessage(data.message, 'success');
             closeRecycleBinModal();
-            fetchFileSystem(); // Refresh file system display
+            applyFileSystemDelta(data.delta); // Patch the local tree instead of refetching it
         } else {
             showMessage('Restore failed: ' + data.message, 'error');
         }
@@ -592,7 +658,7 @@ async function permanentDeleteRecycleBinItem() {
         const response = await fetch(permanentDeleteItemUrl, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ item_index: selectedRecycleBinItemIndex })
+            body: JSON.stringify({ item_id: recycleBinItems[selectedRecycleBinItemIndex].item_id })
         });
         const data = await response.json();
         if (data.success) {
@@ -646,6 +712,7 @@ async function emptyRecycleBin() {
 // Initial fetch of file system when the page loads
 document.addEventListener('DOMContentLoaded', () => {
     fetchFileSystem();
+    subscribeToFileSystemChanges();
 
     // Event listeners for recycle bin modal buttons
     document.getElementById('closeRecycleBinModal').addEventListener('click', closeRecycleBinModal);
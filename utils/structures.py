@@ -1,190 +1,181 @@
 # utils/structures.py
 
 import json
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from operator import attrgetter
 from datetime import datetime
 
+import msgspec
+from msgspec import Struct
+
+# Global indexes of every file in the tree, keyed by lowercase file name and
+# by lowercase author. Maintained by Folder.add_file / remove_file_by_name /
+# delete_file / delete_folder so metadata searches can test each distinct
+# name or author once instead of walking the whole tree.
+# Each bucket is a dict used as an insertion-ordered set ({File: None}), so a
+# file is removed in O(1) however many files share its name or author.
+files_by_name = {}
+files_by_author = {}
+
+def _index_file(file_obj):
+    """Adds a file to the global name and author indexes."""
+    files_by_name.setdefault(file_obj._name_lower, {})[file_obj] = None
+    # Author searches always have a non-empty term, so author-less files (the
+    # /add_file default) are left out rather than piling into one huge '' bucket
+    if file_obj._author_lower:
+        files_by_author.setdefault(file_obj._author_lower, {})[file_obj] = None
+
+def _remove_from_bucket(index, key, file_obj):
+    """Removes a file from one index bucket, dropping the bucket once empty."""
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(file_obj, None)
+        if not bucket:
+            del index[key]
+
+def _unindex_file(file_obj):
+    """Removes a file from the global name and author indexes."""
+    _remove_from_bucket(files_by_name, file_obj._name_lower, file_obj)
+    if file_obj._author_lower:
+        _remove_from_bucket(files_by_author, file_obj._author_lower, file_obj)
+
+class FileMsg(Struct):
+    """
+    Serialization view of a File, encoded directly by msgspec.json.encode.
+    Field order matches File.to_dict.
+    """
+    name: str
+    type: str
+    author: str
+    created_date: str
+    tags: list[str]
+    file_type: str
+
+def _ns_to_iso(ns):
+    """Formats a time.time_ns() timestamp as a local ISO 8601 string (microsecond precision)."""
+    seconds, rest = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=rest // 1000).isoformat()
+
+def _iso_to_ns(iso):
+    """Inverse of _ns_to_iso, for dates read back from to_dict output."""
+    dt = datetime.fromisoformat(iso)
+    return int(dt.replace(microsecond=0).timestamp()) * 1_000_000_000 + dt.microsecond * 1000
+
+_file_name = attrgetter('name') # Sort key for keeping File and Folder lists ordered by name
+
 class File:
     """
     Represents a file in the file system.
     A file has a name, content, and now includes metadata:
     author, created_date, tags (list), and file_type.
     """
+    # Fixed attribute layout: no per-instance __dict__, smaller objects and faster attribute access
+    __slots__ = ('name', 'content', 'author', 'created_date', 'tags', 'file_type', 'parent',
+                 '_name_lower', '_author_lower', '_type_lower', '_tags_lower_set', '_dict_cache',
+                 '_created_iso')
+
     def __init__(self, name, content="", author="", created_date=None, tags=None, file_type=""):
         self.name = name
         self.content = content
         self.author = author
-        # Store creation date as ISO format string for easy serialization
-        self.created_date = created_date if created_date else datetime.now().isoformat()
+        # Creation time in ns since the epoch; formatted as ISO only when serialized
+        self.created_date = created_date if created_date is not None else time.time_ns()
         self.tags = tags if tags is not None else []
         self.file_type = file_type # e.g., 'pdf', 'txt', 'js', 'jpg'
+        self.parent = None # Folder containing this file, set when added to a folder
+        # Lowercased copies of the searchable fields, computed once for metadata search
+        self._name_lower = name.lower()
+        self._author_lower = author.lower()
+        self._type_lower = file_type.lower()
+        self._tags_lower_set = frozenset(tag.lower() for tag in self.tags)
+        self._dict_cache = None # Built lazily by to_dict; files are not modified after creation
+        self._created_iso = None # created_date formatted as ISO, built on first serialization
+
+    @classmethod
+    def from_dict(cls, file_data):
+        """
+        Creates a File from the dictionary produced by to_dict (e.g. a recycle bin entry).
+        """
+        get = file_data.get
+        created_date = get('created_date')
+        if isinstance(created_date, str):
+            created_date = _iso_to_ns(created_date)
+        return cls(
+            file_data['name'],
+            get('content', ''),
+            get('author', ''),
+            created_date,
+            get('tags', []),
+            get('file_type', '')
+        )
+
+    def to_msg(self):
+        """
+        Converts the File object to a FileMsg struct for JSON encoding with msgspec.
+        """
+        return FileMsg(self.name, "file", self.author, self._created_date_iso(), self.tags, self.file_type)
+
+    def _created_date_iso(self):
+        """Returns created_date as an ISO string, formatting it only once."""
+        iso = self._created_iso
+        if iso is None:
+            iso = self._created_iso = _ns_to_iso(self.created_date)
+        return iso
 
     def to_dict(self):
         """
         Converts the File object to a dictionary for JSON serialization,
         including all metadata.
-        """
-        return {
-            "name": self.name,
-            "type": "file",
-            "author": self.author,
-            "created_date": self.created_date,
-            "tags": self.tags,
-            "file_type": self.file_type
-        }
-
-class HashTable:
-    """
-    Implements a hash table with linear probing for collision resolution.
-    It stores File objects, using their names as keys.
-    Supports insert, delete, and search operations.
-    Includes rehashing to maintain efficiency as more items are added.
-    """
-    def __init__(self, capacity=10):
-        self.capacity = capacity
-        self.table = [None] * capacity  # Stores [key, value] pairs
-        self.size = 0  # Current number of items in the hash table
-        self.load_factor_threshold = 0.7  # Threshold for triggering rehashing
-
-    def _hash(self, key):
-        """
-        Simple hash function: sums the ASCII values of characters in the key
-        and takes modulo of the capacity.
-        """
-        return sum(ord(char) for char in key) % self.capacity
-
-    def _probe(self, index, key):
-        """
-        Linear probing to find the correct position for a key (either an empty slot
-        or the slot where the key already exists).
-        Returns (probe_index, found_key_index)
-        If key is found, found_key_index is the index.
-        If key is not found and an empty slot is found, found_key_index is None.
-        """
-        initial_index = index
-        while self.table[index] is not None:
-            # If the key is found, return its index
-            if self.table[index][0] == key:
-                return index, index # Key found at this index
-            index = (index + 1) % self.capacity # Move to the next slot
-            if index == initial_index:
-                # Full circle, table is full and key not found
-                return -1, None # Indicates table is full or search failed
-        return index, None # Empty slot found, key not in table
-
-    def insert(self, key, value):
-        """
-        Inserts a key-value pair into the hash table.
-        Handles collisions using linear probing.
-        Triggers rehashing if the load factor exceeds the threshold.
-        Returns True if insertion was successful, False otherwise (e.g., table full).
-        """
-        # Check if rehashing is needed before insertion
-        if (self.size + 1) / self.capacity > self.load_factor_threshold:
-            self._rehash()
-
-        index = self._hash(key)
-        probe_index, found_key_index = self._probe(index, key)
-
-        if probe_index == -1: # Table is full
-            # print(f"Error: Hash table is full, cannot insert {key}") # Debug print
-            return False
-
-        if found_key_index is not None:
-            # Key already exists, update its value
-            self.table[found_key_index][1] = value
-            return True
-        else:
-            # Insert into the found empty slot
-            self.table[probe_index] = [key, value]
-            self.size += 1
-            return True
-
-    def delete(self, key):
-        """
-        Deletes a key-value pair from the hash table.
-        Uses linear probing to find the key.
-        Returns the deleted value if successful, None otherwise.
-        """
-        index = self._hash(key)
-        probe_index, found_key_index = self._probe(index, key)
-
-        if found_key_index is not None:
-            value = self.table[found_key_index][1]
-            self.table[found_key_index] = None # Mark as deleted
-
-            # Rehash affected elements to maintain search efficiency
-            # Elements inserted via linear probing might need to be re-inserted
-            # if their original hash slot is now empty due to deletion.
-            current_idx = (found_key_index + 1) % self.capacity
-            while self.table[current_idx] is not None:
-                item_key, item_value = self.table[current_idx]
-                # Temporarily remove and decrement size for re-insertion
-                self.table[current_idx] = None
-                self.size -= 1
-                # Re-insert the item
-                self.insert(item_key, item_value)
-                current_idx = (current_idx + 1) % self.capacity
-            self.size -= 1 # Decrement size after successful deletion
-            return value
-        return None # Key not found
-
-    def search(self, key):
-        """
-        Searches for a key in the hash table.
-        Returns the value associated with the key if found, None otherwise.
-        """
-        index = self._hash(key)
-        probe_index, found_key_index = self._probe(index, key)
-
-        if found_key_index is not None:
-            return self.table[found_key_index][1]
-        return None # Key not found
-
-    def _rehash(self):
-        """
-        Doubles the capacity of the hash table and rehashes all existing items.
-        This is called automatically when the load factor threshold is exceeded.
-        """
-        old_table = self.table
-        self.capacity *= 2
-        self.table = [None] * self.capacity
-        self.size = 0 # Reset size as items will be re-inserted
-
-        for item in old_table:
-            if item is not None:
-                key, value = item
-                self.insert(key, value)
-        # print(f"Hash table rehashed. New capacity: {self.capacity}") # Debug print
-
-    def get_all_files(self):
-        """
-        Returns a list of all File objects currently in the hash table.
-        """
-        files = []
-        for item in self.table:
-            if item is not None:
-                files.append(item[1])
-        return files
+        The dict is built once and shared between calls, so callers must treat
+        it as read-only (copy it before adding keys).
+        """
+        cached = self._dict_cache
+        if cached is None:
+            cached = self._dict_cache = {
+                "name": self.name,
+                "type": "file",
+                "author": self.author,
+                "created_date": self._created_date_iso(),
+                "tags": self.tags,
+                "file_type": self.file_type
+            }
+        return cached
 
 class Folder:
     """
     Represents a folder (directory) in the file system.
     A folder has a name, a reference to its parent folder,
-    a dictionary of child folders, and a hash table for its files.
+    a dictionary of child folders, and a dictionary of its files.
     """
+    # Fixed attribute layout, as for File: one Folder per directory adds up on large trees
+    __slots__ = ('name', 'parent', 'children_folders', '_sorted_children', 'files',
+                 '_sorted_files', '_path_cache')
+
     def __init__(self, name, parent=None):
         self.name = name
         self.parent = parent
         self.children_folders = {}  # Dictionary to store child Folder objects by name
-        self.files = HashTable()    # Hash table to store File objects within this folder
+        self._sorted_children = []  # The same child Folder objects kept ordered by name
+        self.files = {}             # Dictionary to store File objects within this folder by name
+        self._sorted_files = []     # The same File objects kept ordered by name for serialization
+        self._path_cache = None     # Full path, computed on first get_path() call
 
     def get_path(self):
         """
-        Recursively constructs the full path of the current folder.
+        Returns the full path of the current folder.
+        The path is built once by walking up the parent chain and then cached;
+        folders are never renamed or moved, so it cannot go stale.
         """
-        if self.parent is None:
-            return f"/{self.name}" # Root folder
-        return f"{self.parent.get_path()}/{self.name}"
+        if self._path_cache is None:
+            parts = []
+            node = self
+            while node is not None:
+                parts.append(node.name)
+                node = node.parent
+            self._path_cache = "/" + "/".join(reversed(parts))
+        return self._path_cache
 
     def add_folder(self, folder_name):
         """
@@ -195,6 +186,7 @@ class Folder:
             return None # Folder already exists
         new_folder = Folder(folder_name, self)
         self.children_folders[folder_name] = new_folder
+        insort(self._sorted_children, new_folder, key=_file_name)
         return new_folder
 
     def get_folder_by_name(self, folder_name):
@@ -208,7 +200,10 @@ class Folder:
         Removes a child folder by name from the children_folders dictionary.
         Returns the removed Folder object, or None if not found.
         """
-        return self.children_folders.pop(folder_name, None)
+        removed_folder = self.children_folders.pop(folder_name, None)
+        if removed_folder:
+            del self._sorted_children[bisect_left(self._sorted_children, folder_name, key=_file_name)]
+        return removed_folder
 
     def delete_folder(self, folder_name):
         """
@@ -216,56 +211,76 @@ class Folder:
         representation along with its full path for the recycle bin.
         Returns (folder_dict, full_path) if successful, None otherwise.
         """
-        folder_to_delete = self.children_folders.get(folder_name)
+        folder_to_delete = self.remove_folder_by_name(folder_name)
         if folder_to_delete:
             full_path = folder_to_delete.get_path()
-            del self.children_folders[folder_name]
+            deleted_files, _ = traverse_and_collect_all_items(folder_to_delete)
+            for file_obj in deleted_files:
+                _unindex_file(file_obj)
             return folder_to_delete.to_dict(), full_path
         return None, None
 
     def add_file(self, file_obj):
         """
-        Adds a new File object to this folder's hash table.
+        Adds a new File object to this folder.
         Returns the new File object if successful, None if a file with that name already exists.
         """
-        if self.files.search(file_obj.name):
+        if self.files.setdefault(file_obj.name, file_obj) is not file_obj:
             return None # File already exists
-        self.files.insert(file_obj.name, file_obj)
+        insort(self._sorted_files, file_obj, key=_file_name)
+        file_obj.parent = self
+        _index_file(file_obj)
         return file_obj
 
+    def bulk_add_files(self, file_objs):
+        """
+        Adds many File objects at once, re-sorting the folder's file list a single
+        time at the end instead of inserting into it file by file.
+        Files whose name already exists in this folder are skipped.
+        Returns the list of File objects that were added.
+        """
+        added_files = []
+        for file_obj in file_objs:
+            if self.files.setdefault(file_obj.name, file_obj) is not file_obj:
+                continue # File already exists
+            file_obj.parent = self
+            _index_file(file_obj)
+            added_files.append(file_obj)
+        if added_files:
+            self._sorted_files.extend(added_files)
+            self._sorted_files.sort(key=_file_name)
+        return added_files
+
     def get_file_by_name(self, file_name):
         """
-        Retrieves a file from this folder's hash table by name.
+        Retrieves a file from this folder by name.
         """
-        return self.files.search(file_name)
+        return self.files.get(file_name)
 
     def remove_file_by_name(self, file_name):
         """
-        Removes a file from this folder's hash table by name.
+        Removes a file from this folder by name.
         Returns the removed File object, or None if not found.
         """
-        return self.files.delete(file_name)
+        removed_file = self.files.pop(file_name, None)
+        if removed_file:
+            del self._sorted_files[bisect_left(self._sorted_files, file_name, key=_file_name)]
+            _unindex_file(removed_file)
+        return removed_file
 
     def delete_file(self, file_name):
         """
-        Deletes a file from this folder's hash table and returns its dictionary
+        Deletes a file from this folder and returns its dictionary
         representation along with its full path for the recycle bin.
         Returns (file_dict, full_path) if successful, None otherwise.
         """
-        file_to_delete = self.files.delete(file_name)
+        file_to_delete = self.remove_file_by_name(file_name)
         if file_to_delete:
+            file_to_delete.parent = None
             full_path = f"{self.get_path()}/{file_to_delete.name}"
             return file_to_delete.to_dict(), full_path
         return None, None
 
-    def get_sorted_files_by_name(self):
-        """
-        Retrieves all files from this folder's hash table, sorts them by name,
-        and returns the sorted list. This is to support binary search.
-        """
-        all_files = self.files.get_all_files()
-        return sorted(all_files, key=lambda file_obj: file_obj.name)
-
     def to_dict(self):
         """
         Recursively converts the Folder object and its contents (children folders and files)
@@ -274,64 +289,81 @@ class Folder:
         folder_dict = {
             "name": self.name,
             "type": "folder",
-            # Sort children and files for consistent display (optional but good practice)
-            "children": sorted([child.to_dict() for child in self.children_folders.values()], key=lambda x: x['name']),
-            "files": sorted([file_obj.to_dict() for file_obj in self.files.get_all_files()], key=lambda x: x['name'])
+            # Children and files are kept sorted by name for consistent display
+            "children": [child.to_dict() for child in self._sorted_children],
+            "files": [file_obj.to_dict() for file_obj in self._sorted_files]
         }
         return folder_dict
 
+    def iter_json(self):
+        """
+        Yields the JSON encoding of this subtree piece by piece, producing the
+        same document as to_dict() without building the dict tree. Uses an
+        explicit stack, so deep trees cannot hit the recursion limit.
+        Files are encoded with msgspec through to_msg().
+        """
+        encode = msgspec.json.encode
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if item.__class__ is bytes:
+                yield item
+                continue
+            yield b'{"name":' + encode(item.name) + b',"type":"folder","children":['
+            # Pushed first so it is emitted after every child of this folder
+            stack.append(b'],"files":' + encode([file_obj.to_msg() for file_obj in item._sorted_files]) + b'}')
+            # Snapshot of the children, so a concurrent change cannot break the iteration
+            children = tuple(item._sorted_children)
+            for i in range(len(children) - 1, -1, -1):
+                stack.append(children[i])
+                if i:
+                    stack.append(b',')
+
 class RecycleBin:
     """
     Manages deleted files and folders, allowing for restoration or permanent deletion.
-    Stores items as dictionaries along with their original paths.
+    Original paths and item dictionaries are kept in two parallel dicts keyed by a
+    monotonically increasing item ID (no wrapper dict per item).
     """
     def __init__(self):
-        self.items = [] # List of {'original_path': path, 'item_data': item_dict}
+        self.paths = {} # {item_id: original_path}
+        self.data = {} # {item_id: item_dict}, same keys and order as paths
+        self._next_id = 0
 
     def add_item(self, original_path, item_data):
-        """Adds a deleted item to the recycle bin."""
-        self.items.append({'original_path': original_path, 'item_data': item_data})
+        """Adds a deleted item to the recycle bin and returns its ID."""
+        item_id = self._next_id
+        self._next_id += 1
+        self.paths[item_id] = original_path
+        self.data[item_id] = item_data
+        return item_id
 
     def get_all_items(self):
-        """Returns all items in the recycle bin."""
-        return self.items
-
-    def get_item(self, index):
-        """Retrieves an item by index."""
-        if 0 <= index < len(self.items):
-            return self.items[index]
-        return None
-
-    def remove_item(self, index):
-        """Removes an item permanently by index."""
-        if 0 <= index < len(self.items):
-            return self.items.pop(index)
-        return None
-
-# Binary search function (standalone helper function)
-def binary_search_files(sorted_files, target_file_name):
-    """
-    Performs a binary search on a list of sorted File objects by their name.
-    Args:
-        sorted_files (list[File]): A list of File objects, sorted by name.
-        target_file_name (str): The name of the file to search for.
-    Returns:
-        File: The File object if found, None otherwise.
-    """
-    low = 0
-    high = len(sorted_files) - 1
+        """
+        Returns all items in the recycle bin as dictionaries with 'item_id',
+        'original_path' and 'item_data', in deletion order.
+        """
+        return [{'item_id': item_id, 'original_path': original_path, 'item_data': item_data}
+                for (item_id, original_path), item_data in zip(self.paths.items(), self.data.values())]
+
+    def get_item(self, item_id):
+        """Retrieves an item by ID as (original_path, item_data), or None if not found."""
+        original_path = self.paths.get(item_id)
+        if original_path is None:
+            return None
+        return original_path, self.data[item_id]
 
-    while low <= high:
-        mid = (low + high) // 2
-        mid_file_name = sorted_files[mid].name
+    def remove_item(self, item_id):
+        """Removes an item permanently by ID. Returns (original_path, item_data), or None if not found."""
+        original_path = self.paths.pop(item_id, None)
+        if original_path is None:
+            return None
+        return original_path, self.data.pop(item_id)
 
-        if mid_file_name == target_file_name:
-            return sorted_files[mid]
-        elif mid_file_name < target_file_name:
-            low = mid + 1
-        else:
-            high = mid - 1
-    return None
+    def clear(self):
+        """Removes all items from the recycle bin."""
+        self.paths.clear()
+        self.data.clear()
 
 def traverse_and_collect_all_items(start_folder):
     """
@@ -341,14 +373,13 @@ def traverse_and_collect_all_items(start_folder):
     all_files = []
     all_folders = []
 
-    queue = [start_folder]
+    queue = deque([start_folder]) # deque gives O(1) pops from the front
     while queue:
-        current_folder = queue.pop(0)
+        current_folder = queue.popleft()
         all_folders.append(current_folder)
 
-        all_files.extend(current_folder.files.get_all_files())
+        all_files.extend(current_folder.files.values())
 
-        for child_folder in current_folder.children_folders.values():
-            queue.append(child_folder)
+        queue.extend(current_folder.children_folders.values())
     return all_files, all_folders
 
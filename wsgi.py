@@ -0,0 +1,11 @@
+# wsgi.py
+
+# Patch the standard library for cooperative I/O before anything else is imported.
+# Run with: gunicorn -k gevent -w 1 --worker-connections 1000 wsgi:app
+# Keep a single worker: the folder tree, recycle bin, response cache and /fs_stream
+# subscribers live in process memory, so separate workers would each see their own
+# file system. gevent provides the concurrency through --worker-connections.
+from gevent import monkey
+monkey.patch_all()
+
+from app import app